@@ -3,14 +3,24 @@ Configuration settings for the ATM System
 """
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
+
+@lru_cache(maxsize=None)
+def _env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Read an environment variable once and cache the result"""
+    return os.getenv(key, default)
+
+
+@dataclass(slots=True, frozen=True)
 class Settings:
     """Application settings"""
     
     # Server settings
     HOST: str = "0.0.0.0"
-    PORT: int = int(os.getenv("PORT", "8000"))  # Render sets PORT automatically
+    PORT: int = int(_env("PORT", "8000"))  # Render sets PORT automatically
     
     # Application settings
     APP_NAME: str = "DV ATM System"
@@ -18,20 +28,21 @@ class Settings:
     APP_VERSION: str = "1.0.0"
     
     # Account settings
-    MAX_ACCOUNTS: int = int(os.getenv("MAX_ACCOUNTS", "1000"))
+    MAX_ACCOUNTS: int = int(_env("MAX_ACCOUNTS", "1000"))
     MIN_BALANCE: float = 0.0
-    MAX_TRANSACTION_AMOUNT: float = float(os.getenv("MAX_TRANSACTION_AMOUNT", "10000.0"))
+    MAX_TRANSACTION_AMOUNT: float = float(_env("MAX_TRANSACTION_AMOUNT", "10000.0"))
+    MAX_BATCH_OPERATIONS: int = int(_env("MAX_BATCH_OPERATIONS", "100"))
     
     # Logging settings
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL: str = _env("LOG_LEVEL", "INFO")
     
     # Environment
-    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    ENVIRONMENT: str = _env("ENVIRONMENT", "development")
     DEBUG: bool = ENVIRONMENT == "development"
     
     # Production settings
-    RENDER_EXTERNAL_URL: Optional[str] = os.getenv("RENDER_EXTERNAL_URL")
-    IS_RENDER: bool = os.getenv("RENDER") == "true"
+    RENDER_EXTERNAL_URL: Optional[str] = _env("RENDER_EXTERNAL_URL")
+    IS_RENDER: bool = _env("RENDER") == "true"
 
 # Global settings instance
 settings = Settings()
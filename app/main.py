@@ -5,11 +5,12 @@ A thread-safe ATM system with account management capabilities.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
 from .config import settings
 from .routers import accounts_router, health_router, welcome_router
 from .utils.logger import logger
+from .utils.template_loader import load_template
 
 # Create FastAPI application
 app = FastAPI(
@@ -18,7 +19,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
     docs_url="/docs",  # Enable docs in all environments
-    redoc_url="/redoc"  # Enable ReDoc in all environments
+    redoc_url="/redoc",  # Enable ReDoc in all environments
+    default_response_class=ORJSONResponse  # orjson encodes dicts/datetimes natively
 )
 
 # Add CORS middleware for web access
@@ -26,8 +28,10 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"] if settings.DEBUG else [settings.RENDER_EXTERNAL_URL] if settings.RENDER_EXTERNAL_URL else ["*"],
     allow_credentials=True,
-    allow_methods=["GET", "POST", "DELETE"],
-    allow_headers=["*"],
+    # Fixed method/header sets let the middleware answer preflights by set
+    # membership instead of reflecting every requested header
+    allow_methods=("GET", "POST", "DELETE"),
+    allow_headers=("content-type", "authorization"),
 )
 
 # Include routers
@@ -42,6 +46,12 @@ async def startup_event():
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Max accounts: {settings.MAX_ACCOUNTS}")
     logger.info(f"Max transaction amount: {settings.MAX_TRANSACTION_AMOUNT}")
+    
+    # Warm the template cache so the first request to / skips the disk read
+    try:
+        load_template("welcome.html")
+    except FileNotFoundError as e:
+        logger.error(f"Template not found: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -2,23 +2,41 @@
 Unified Account Router - All account operations including transactions
 """
 
-from fastapi import APIRouter, HTTPException, status
+import re
+from typing import Annotated
+
+from fastapi import APIRouter, Body, HTTPException, Response, status
 
 from ..schemas import (
     AccountCreate, 
     AccountCreateResponse, 
     BalanceResponse,
-    TransactionRequest,
+    BatchTransactionRequest,
+    BatchTransactionResponse,
+    TransactionAmount,
     TransactionResponse
 )
 from ..services.account_service import account_service
 from ..utils.logger import logger
 
+# Account numbers are 32 lowercase hex chars; anything else cannot exist and is
+# never interpolated into the pre-built balance response below
+_ACCOUNT_NUMBER_RE = re.compile(r"[0-9a-f]{32}")
+_BALANCE_TMPL = b'{"account_number":"%s","balance":%s}'
+
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
+# Hot-path endpoints return plain dicts from the service and skip response_model
+# validation; the schemas are still published through `responses` for the docs.
+
 # Account Management Endpoints
 
-@router.post("", response_model=AccountCreateResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=None,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_201_CREATED: {"model": AccountCreateResponse}}
+)
 async def create_account(account_data: AccountCreate):
     """Create a new account with optional initial balance"""
     try:
@@ -32,11 +50,20 @@ async def create_account(account_data: AccountCreate):
             detail="Internal server error during account creation"
         )
 
-@router.get("/{account_number}/balance", response_model=BalanceResponse)
+@router.get("/{account_number}/balance", response_model=None, responses={200: {"model": BalanceResponse}})
 async def get_balance(account_number: str):
     """Retrieve the current balance of the user's account"""
+    if not _ACCOUNT_NUMBER_RE.fullmatch(account_number):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
     try:
-        return account_service.get_balance(account_number)
+        balance = account_service.get_balance_value(account_number)
+        return Response(
+            content=_BALANCE_TMPL % (account_number.encode(), repr(balance).encode()),
+            media_type="application/json"
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -74,13 +101,26 @@ async def list_accounts():
         )
 
 # Transaction Endpoints
+# The single-field body {"amount": ...} is validated as an embedded scalar
+# rather than by instantiating a TransactionRequest model per call.
 
-@router.post("/{account_number}/withdraw", response_model=TransactionResponse)
-async def withdraw_money(account_number: str, transaction: TransactionRequest):
+@router.post("/{account_number}/withdraw", response_model=None, responses={200: {"model": TransactionResponse}})
+async def withdraw_money(
+    account_number: str,
+    amount: Annotated[TransactionAmount, Body(embed=True)]
+):
     """Withdraw a specified amount of money from the user's account"""
-    return account_service.withdraw_money(account_number, transaction.amount)
+    return account_service.withdraw_money(account_number, amount)
 
-@router.post("/{account_number}/deposit", response_model=TransactionResponse)
-async def deposit_money(account_number: str, transaction: TransactionRequest):
+@router.post("/{account_number}/deposit", response_model=None, responses={200: {"model": TransactionResponse}})
+async def deposit_money(
+    account_number: str,
+    amount: Annotated[TransactionAmount, Body(embed=True)]
+):
     """Deposit a specified amount of money into the user's account"""
-    return account_service.deposit_money(account_number, transaction.amount)
\ No newline at end of file
+    return account_service.deposit_money(account_number, amount)
+
+@router.post("/{account_number}/batch", response_model=None, responses={200: {"model": BatchTransactionResponse}})
+async def batch_transactions(account_number: str, batch: BatchTransactionRequest):
+    """Apply a list of deposits/withdrawals to the user's account in order, under one lock"""
+    return account_service.batch_transactions(account_number, [(op.op, op.amount) for op in batch.ops])
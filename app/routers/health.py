@@ -2,6 +2,7 @@
 Health check endpoints
 """
 
+import time
 from fastapi import APIRouter
 from datetime import datetime
 
@@ -10,13 +11,29 @@ from ..config import settings
 
 router = APIRouter(tags=["health"])
 
+# Static part of the health payload (never changes at runtime)
+_MAX_ACCOUNTS = settings.MAX_ACCOUNTS
+_VERSION = settings.APP_VERSION
+
+# Timestamps are refreshed at most once per TTL window
+_TIMESTAMP_TTL = 0.5
+_timestamp_cache = {"expires": 0.0, "value": ""}
+
+def _cached_timestamp() -> str:
+    """Return the current ISO timestamp, cached for _TIMESTAMP_TTL seconds"""
+    now = time.monotonic()
+    if now >= _timestamp_cache["expires"]:
+        _timestamp_cache["value"] = datetime.now().isoformat()
+        _timestamp_cache["expires"] = now + _TIMESTAMP_TTL
+    return _timestamp_cache["value"]
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint for load balancer"""
     return {
         "status": "healthy", 
         "accounts_count": account_service.get_account_count(),
-        "max_accounts": settings.MAX_ACCOUNTS,
-        "timestamp": datetime.now().isoformat(),
-        "version": settings.APP_VERSION
+        "max_accounts": _MAX_ACCOUNTS,
+        "timestamp": _cached_timestamp(),
+        "version": _VERSION
     }
@@ -1,12 +1,25 @@
 """Schemas module"""
 from .account import Account, AccountCreate, AccountCreateResponse, BalanceResponse
-from .transaction import TransactionRequest, TransactionResponse
+from .transaction import (
+    BatchOperation,
+    BatchOperationResult,
+    BatchTransactionRequest,
+    BatchTransactionResponse,
+    TransactionAmount,
+    TransactionRequest,
+    TransactionResponse
+)
 
 __all__ = [
     "Account",
     "AccountCreate", 
     "AccountCreateResponse",
     "BalanceResponse",
+    "BatchOperation",
+    "BatchOperationResult",
+    "BatchTransactionRequest",
+    "BatchTransactionResponse",
+    "TransactionAmount",
     "TransactionRequest",
     "TransactionResponse"
 ]
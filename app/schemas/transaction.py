@@ -2,17 +2,20 @@
 Transaction-related Pydantic schemas
 """
 
+from annotated_types import Gt, Le
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
+from typing import Annotated, List, Literal, Optional
 from ..config import settings
 
+# A single deposit/withdraw amount: positive and at most MAX_TRANSACTION_AMOUNT.
+# The bounds are plain constraints rather than a Field so the router can also
+# attach Body(embed=True) to this type (FastAPI allows one FieldInfo per parameter).
+TransactionAmount = Annotated[float, Gt(0), Le(settings.MAX_TRANSACTION_AMOUNT)]
+
 class TransactionRequest(BaseModel):
     """Transaction request (deposit/withdraw)"""
-    amount: float = Field(
-        gt=0, 
-        le=settings.MAX_TRANSACTION_AMOUNT, 
-        description=f"Amount must be positive and not exceed {settings.MAX_TRANSACTION_AMOUNT}"
-    )
+    amount: TransactionAmount
 
 class TransactionResponse(BaseModel):
     """Transaction response"""
@@ -21,3 +24,31 @@ class TransactionResponse(BaseModel):
     transaction_amount: float
     transaction_type: str
     timestamp: datetime
+
+class BatchOperation(BaseModel):
+    """Single operation within a batch transaction request"""
+    op: Literal["deposit", "withdraw"]
+    amount: TransactionAmount
+
+class BatchTransactionRequest(BaseModel):
+    """Batch of deposits/withdrawals applied in order to one account"""
+    ops: List[BatchOperation] = Field(
+        min_length=1,
+        max_length=settings.MAX_BATCH_OPERATIONS,
+        description=f"Between 1 and {settings.MAX_BATCH_OPERATIONS} operations"
+    )
+
+class BatchOperationResult(BaseModel):
+    """Outcome of a single operation within a batch"""
+    transaction_type: str
+    transaction_amount: float
+    new_balance: float
+    success: bool
+    detail: Optional[str] = None
+
+class BatchTransactionResponse(BaseModel):
+    """Batch transaction response"""
+    account_number: str
+    new_balance: float
+    results: List[BatchOperationResult]
+    timestamp: datetime
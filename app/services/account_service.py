@@ -2,32 +2,46 @@
 Account Service - Unified business logic for account operations
 """
 
+import logging
+import secrets
 import threading
-import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict
-from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
 from fastapi import HTTPException, status
 
-from ..schemas import Account, AccountCreateResponse, BalanceResponse, TransactionResponse
 from ..config import settings
 from ..utils.logger import logger
 
+@dataclass(slots=True)
+class _AccountRecord:
+    """Internal mutable account state (the pydantic schemas are only used at the API boundary)"""
+    balance: float
+    created_at: datetime
+    last_updated: datetime
+
 class AccountService:
     """Unified service for all account operations including transactions"""
     
+    # Number of striped account locks (must be a power of two)
+    _LOCK_STRIPES = 1024
+    
     def __init__(self):
         """Initialize the account service with thread-safe storage"""
-        self.accounts: Dict[str, Account] = {}
-        # Global lock only for account creation/deletion and metadata operations
+        self.accounts: Dict[str, _AccountRecord] = {}
+        # Global lock only for account creation/deletion
         self.global_lock = threading.RLock()
-        # Per-account locks for transaction operations
-        self.account_locks: Dict[str, threading.RLock] = defaultdict(threading.RLock)
+        # Striped per-account locks for transaction operations; an account maps to
+        # the stripe at hash(account_number) & (_LOCK_STRIPES - 1)
+        self.account_locks: List[threading.RLock] = [threading.RLock() for _ in range(self._LOCK_STRIPES)]
     
     # Account Management Operations
     
-    def create_account(self, initial_balance: float = 0.0) -> AccountCreateResponse:
+    def create_account(self, initial_balance: float = 0.0) -> Dict[str, Any]:
         """Create a new account with initial balance"""
+        # Account numbers are independent of account state, so generate outside the lock
+        account_number = secrets.token_hex(16)
+        
         with self.global_lock:
             if len(self.accounts) >= settings.MAX_ACCOUNTS:
                 raise HTTPException(
@@ -35,36 +49,33 @@ class AccountService:
                     detail=f"Maximum number of accounts ({settings.MAX_ACCOUNTS}) reached"
                 )
             
-            account_number = str(uuid.uuid4())
             now = datetime.now()
             
-            account = Account(
-                account_number=account_number,
+            self.accounts[account_number] = _AccountRecord(
                 balance=initial_balance,
                 created_at=now,
                 last_updated=now
             )
             
-            self.accounts[account_number] = account
-            # Initialize the account lock (this is thread-safe due to defaultdict)
-            _ = self.account_locks[account_number]
+            logger.info("Created account %s with balance %s", account_number, initial_balance)
             
-            logger.info(f"Created account {account_number} with balance {initial_balance}")
-            
-            return AccountCreateResponse(
-                account_number=account_number,
-                balance=initial_balance,
-                message="Account created successfully"
-            )
+            return {
+                "account_number": account_number,
+                "balance": initial_balance,
+                "message": "Account created successfully"
+            }
     
-    def get_balance(self, account_number: str) -> BalanceResponse:
+    def get_balance(self, account_number: str) -> Dict[str, Any]:
         """Get account balance"""
-        with self.account_locks[account_number]:
-            account = self._get_account_unsafe(account_number)
-            return BalanceResponse(
-                account_number=account.account_number,
-                balance=account.balance
-            )
+        return {
+            "account_number": account_number,
+            "balance": self.get_balance_value(account_number)
+        }
+    
+    def get_balance_value(self, account_number: str) -> float:
+        """Get account balance as a bare float"""
+        # Lock-free read: a dict lookup plus a single slot read are atomic under the GIL
+        return self._get_account_unsafe(account_number).balance
     
     def delete_account(self, account_number: str) -> None:
         """Delete an account"""
@@ -75,76 +86,96 @@ class AccountService:
                     detail="Account not found"
                 )
             # Get account lock first to ensure no ongoing transactions
-            with self.account_locks[account_number]:
+            with self._account_lock(account_number):
                 del self.accounts[account_number]
-                # Clean up the lock (optional, but good for memory)
-                if account_number in self.account_locks:
-                    del self.account_locks[account_number]
-            logger.info(f"Deleted account {account_number}")
+            logger.info("Deleted account %s", account_number)
     
     def list_all_accounts(self) -> Dict:
         """List all accounts (for admin purposes)"""
-        with self.global_lock:
-            accounts_info = []
-            for account_number, account in self.accounts.items():
-                accounts_info.append({
-                    "account_number": account_number,
-                    "balance": account.balance,
-                    "created_at": account.created_at.isoformat(),
-                    "last_updated": account.last_updated.isoformat()
-                })
-            
-            return {
-                "total_accounts": len(accounts_info),
-                "max_accounts": settings.MAX_ACCOUNTS,
-                "accounts": accounts_info
+        # Lock-free snapshot: copying the dict is atomic under the GIL, formatting happens afterwards
+        snapshot = [
+            (account_number, record.balance, record.created_at, record.last_updated)
+            for account_number, record in dict(self.accounts).items()
+        ]
+        
+        accounts_info = [
+            {
+                "account_number": account_number,
+                "balance": balance,
+                "created_at": created_at.isoformat(),
+                "last_updated": last_updated.isoformat()
             }
+            for account_number, balance, created_at, last_updated in snapshot
+        ]
+        
+        return {
+            "total_accounts": len(accounts_info),
+            "max_accounts": settings.MAX_ACCOUNTS,
+            "accounts": accounts_info
+        }
     
     def get_account_count(self) -> int:
         """Get total number of accounts"""
-        with self.global_lock:
-            return len(self.accounts)
+        return len(self.accounts)
     
     # Transaction Operations
     
-    def withdraw_money(self, account_number: str, amount: float) -> TransactionResponse:
+    def withdraw_money(self, account_number: str, amount: float) -> Dict[str, Any]:
         """Process money withdrawal with atomic transaction"""
         try:
             return self._atomic_transaction(account_number, -amount, "withdrawal")
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error withdrawing from account {account_number}: {str(e)}")
+            logger.error("Error withdrawing from account %s: %s", account_number, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error during withdrawal"
             )
     
-    def deposit_money(self, account_number: str, amount: float) -> TransactionResponse:
+    def deposit_money(self, account_number: str, amount: float) -> Dict[str, Any]:
         """Process money deposit with atomic transaction"""
         try:
             return self._atomic_transaction(account_number, amount, "deposit")
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error depositing to account {account_number}: {str(e)}")
+            logger.error("Error depositing to account %s: %s", account_number, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error during deposit"
             )
     
+    def batch_transactions(self, account_number: str, ops: Sequence[Tuple[str, float]]) -> Dict[str, Any]:
+        """Apply a batch of ("deposit" | "withdraw", amount) operations under a single lock"""
+        try:
+            return self._atomic_batch(account_number, ops)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error applying batch to account %s: %s", account_number, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error during batch transaction"
+            )
+    
     # Private Helper Methods
     
-    def _get_account_unsafe(self, account_number: str) -> Account:
-        """Get account by account number (must be called within appropriate lock)"""
-        if account_number not in self.accounts:
+    def _account_lock(self, account_number: str) -> threading.RLock:
+        """Get the lock stripe guarding the given account"""
+        return self.account_locks[hash(account_number) & (self._LOCK_STRIPES - 1)]
+    
+    def _get_account_unsafe(self, account_number: str) -> _AccountRecord:
+        """Get account by account number (a single lookup, safe against concurrent deletion)"""
+        account = self.accounts.get(account_number)
+        if account is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Account not found"
             )
-        return self.accounts[account_number]
+        return account
     
-    def _atomic_transaction(self, account_number: str, amount_change: float, transaction_type: str) -> TransactionResponse:
+    def _atomic_transaction(self, account_number: str, amount_change: float, transaction_type: str) -> Dict[str, Any]:
         """
         Perform an atomic transaction (deposit or withdrawal).
         
@@ -154,10 +185,10 @@ class AccountService:
             transaction_type: "deposit" or "withdrawal"
         
         Returns:
-            TransactionResponse with updated account information
+            Dict matching TransactionResponse with updated account information
         """
         # Use per-account lock for maximum concurrency
-        with self.account_locks[account_number]:
+        with self._account_lock(account_number):
             # Get account (this will raise 404 if not found)
             account = self._get_account_unsafe(account_number)
             old_balance = account.balance
@@ -171,22 +202,84 @@ class AccountService:
                 )
             
             # Update balance atomically
+            timestamp = datetime.now()
             account.balance = new_balance
-            account.last_updated = datetime.now()
-            self.accounts[account_number] = account
-            
-            # Get the absolute transaction amount for logging/response
-            transaction_amount = abs(amount_change)
+            account.last_updated = timestamp
+        
+        # Log and build the response from captured locals outside the critical section
+        transaction_amount = abs(amount_change)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "%s: Account %s, Amount: %s, Old Balance: %s, New Balance: %s",
+                transaction_type.title(), account_number, transaction_amount, old_balance, new_balance
+            )
+        
+        return {
+            "account_number": account_number,
+            "new_balance": new_balance,
+            "transaction_amount": transaction_amount,
+            "transaction_type": transaction_type,
+            "timestamp": timestamp
+        }
+
+    def _atomic_batch(self, account_number: str, ops: Sequence[Tuple[str, float]]) -> Dict[str, Any]:
+        """
+        Apply a batch of operations in order, taking the account lock once.
+        
+        Each operation succeeds or fails on its own: a withdrawal that would
+        overdraw the account is recorded as failed and the batch continues.
+        
+        Args:
+            account_number: The account to modify
+            ops: Sequence of ("deposit" | "withdraw", amount) pairs
+        
+        Returns:
+            Dict matching BatchTransactionResponse with per-operation results
+        """
+        outcomes = []
+        
+        with self._account_lock(account_number):
+            # Get account (this will raise 404 if not found)
+            account = self._get_account_unsafe(account_number)
+            balance = account.balance
             
-            logger.info(f"{transaction_type.title()}: Account {account_number}, Amount: {transaction_amount}, Old Balance: {old_balance}, New Balance: {new_balance}")
+            for op, amount in ops:
+                if op == "withdraw":
+                    if balance - amount < 0:
+                        outcomes.append(("withdrawal", amount, balance, False))
+                        continue
+                    balance -= amount
+                    outcomes.append(("withdrawal", amount, balance, True))
+                else:
+                    balance += amount
+                    outcomes.append(("deposit", amount, balance, True))
             
-            return TransactionResponse(
-                account_number=account_number,
-                new_balance=new_balance,
-                transaction_amount=transaction_amount,
-                transaction_type=transaction_type,
-                timestamp=account.last_updated
+            timestamp = datetime.now()
+            account.balance = balance
+            account.last_updated = timestamp
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Batch: Account %s, Operations: %s, New Balance: %s",
+                account_number, len(outcomes), balance
             )
+        
+        return {
+            "account_number": account_number,
+            "new_balance": balance,
+            "results": [
+                {
+                    "transaction_type": transaction_type,
+                    "transaction_amount": amount,
+                    "new_balance": new_balance,
+                    "success": success,
+                    "detail": None if success else "Insufficient funds"
+                }
+                for transaction_type, amount, new_balance, success in outcomes
+            ],
+            "timestamp": timestamp
+        }
 
 # Global service instance
 account_service = AccountService()
@@ -6,16 +6,21 @@ import logging
 import sys
 from ..config import settings
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
 def setup_logger():
     """Configure application logging"""
-    logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    return logging.getLogger(__name__)
+    app_logger = logging.getLogger(__name__)
+    app_logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+    
+    if not app_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, style='%'))
+        app_logger.addHandler(handler)
+    
+    # Our handler is attached directly; don't duplicate records through root handlers
+    app_logger.propagate = False
+    return app_logger
 
 # Global logger instance
 logger = setup_logger()
@@ -2,12 +2,15 @@
 Template loader utility for HTML templates
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=8)
 def load_template(template_name: str) -> str:
     """
-    Load an HTML template from the templates directory
+    Load an HTML template from the templates directory.
+    The content is cached in memory after the first successful read.
     
     Args:
         template_name: Name of the template file (e.g., 'welcome.html')
@@ -1,104 +1,153 @@
 #!/usr/bin/env python3
 """
 Advanced Thread Safety Test for ATM System
-Tests both:
+Tests:
 1. Same account operations are serialized (thread-safe)
 2. Different account operations run concurrently (performance)
+3. Mixed operations keep every balance consistent
+4. Concurrent batch requests on one account are serialized
+5. Batch request validation
 """
 
+import asyncio
+import httpx
+import os
 import requests
-import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
-import statistics
 
 # Configuration
 BASE_URL = "http://localhost:8000"  # FastAPI direct port
 NUM_ACCOUNTS = 5
 TRANSACTIONS_PER_ACCOUNT = 20
 CONCURRENT_THREADS = 50
+DEPOSIT_AMOUNT = 50.0
+WITHDRAWAL_AMOUNT = 25.0
+# Cap on simultaneous connections to the server. Throughput tends to knee at about
+# 2x cores ((2 * cores) + spindles); beyond that extra in-flight requests only add
+# context switching and lock contention on the server
+POOL_SIZE = min(32, (os.cpu_count() or 4) * 2)
+# Must match the server's MAX_BATCH_OPERATIONS setting
+MAX_BATCH_OPERATIONS = int(os.environ.get("MAX_BATCH_OPERATIONS", "100"))
 
 class AdvancedThreadingTester:
     def __init__(self, base_url: str = BASE_URL):
         self.base_url = base_url
+        # (account_number, display prefix) pairs
         self.accounts = []
         self.results = []
         self.timing_data = defaultdict(list)
+        # Shared httpx client, opened in run_advanced_threading_tests
+        self.session = None
         
-    def setup_multiple_accounts(self, num_accounts: int = NUM_ACCOUNTS, initial_balance: float = 10000.0):
-        """Create multiple test accounts"""
+    async def setup_multiple_accounts(self, num_accounts: int = NUM_ACCOUNTS, initial_balance: float = 10000.0):
+        """Create multiple test accounts concurrently"""
         print(f"🔧 Setting up {num_accounts} test accounts...")
         
-        for i in range(num_accounts):
+        async def create_account():
             payload = {"initial_balance": initial_balance}
-            response = requests.post(f"{self.base_url}/accounts", json=payload)
-            
-            if response.status_code == 201:
-                data = response.json()
+            response = await self.session.post("/accounts", json=payload)
+            return response.status_code, response.json() if response.status_code == 201 else None
+        
+        # Let every create finish even if some fail, so each 201 is recorded for cleanup
+        outcomes = await asyncio.gather(
+            *(create_account() for _ in range(num_accounts)),
+            return_exceptions=True
+        )
+        
+        success = True
+        for i, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                print(f"❌ Error creating account {i+1}: {outcome}")
+                success = False
+                continue
+            status_code, data = outcome
+            if status_code == 201:
                 account_number = data["account_number"]
-                self.accounts.append(account_number)
-                print(f"✅ Created account {i+1}: {account_number[:8]}...")
+                self.accounts.append((account_number, account_number[:8]))
             else:
-                print(f"❌ Failed to create account {i+1}: {response.status_code}")
-                return False
+                print(f"❌ Failed to create account {i+1}: {status_code}")
+                success = False
         
-        return True
+        print(f"✅ Created {len(self.accounts)} accounts: {', '.join(short for _, short in self.accounts)}")
+        return success
     
-    def cleanup_accounts(self):
-        """Delete all test accounts"""
+    async def cleanup_accounts(self):
+        """Delete all test accounts concurrently"""
         print("🧹 Cleaning up test accounts...")
-        for account in self.accounts:
-            try:
-                response = requests.delete(f"{self.base_url}/accounts/{account}")
-                if response.status_code == 204:
-                    print(f"✅ Deleted account {account[:8]}...")
-                else:
-                    print(f"⚠️ Failed to delete account {account[:8]}: {response.status_code}")
-            except Exception as e:
-                print(f"⚠️ Error deleting account {account[:8]}: {e}")
+        
+        async def delete_account(account):
+            response = await self.session.delete(f"/accounts/{account}")
+            return response.status_code
+        
+        outcomes = await asyncio.gather(
+            *(delete_account(account) for account, _ in self.accounts),
+            return_exceptions=True
+        )
+        
+        deleted = 0
+        for (account, short), outcome in zip(self.accounts, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"⚠️ Error deleting account {short}: {outcome}")
+            elif outcome == 204:
+                deleted += 1
+            else:
+                print(f"⚠️ Failed to delete account {short}: {outcome}")
+        
+        print(f"✅ Deleted {deleted} accounts")
     
-    def transaction_worker(self, account_number: str, thread_id: int, num_transactions: int = 10):
-        """Worker that performs multiple transactions on a single account"""
+    async def get_balance(self, account_number: str) -> float:
+        """Fetch the current balance of an account"""
+        response = await self.session.get(f"/accounts/{account_number}/balance")
+        return response.json()["balance"]
+    
+    @staticmethod
+    def expected_balance_cents(initial_balance: float, successful_results: list) -> int:
+        """Expected balance in integer cents after the given successful operations"""
+        deposits = sum(1 for r in successful_results if r["operation"] == "deposit")
+        withdrawals = len(successful_results) - deposits
+        return (round(initial_balance * 100)
+                + round(DEPOSIT_AMOUNT * 100) * deposits
+                - round(WITHDRAWAL_AMOUNT * 100) * withdrawals)
+    
+    async def transaction_worker(self, account_number: str, thread_id: int, num_transactions: int = 10):
+        """
+        Worker that performs multiple transactions on a single account, one
+        /deposit or /withdraw request each.
+        Returns (results, timings); timings are merged into self.timing_data by the caller.
+        """
         results = []
+        local_timings = []
         
         for i in range(num_transactions):
+            # Alternate between deposits and withdrawals
+            if i % 2 == 0:
+                operation, endpoint, amount = "deposit", "deposit", DEPOSIT_AMOUNT
+            else:
+                operation, endpoint, amount = "withdrawal", "withdraw", WITHDRAWAL_AMOUNT
+            
             start_time = time.time()
             
             try:
-                # Alternate between deposits and withdrawals
-                if i % 2 == 0:
-                    # Deposit
-                    response = requests.post(
-                        f"{self.base_url}/accounts/{account_number}/deposit",
-                        json={"amount": 50.0}
-                    )
-                    operation = "deposit"
-                else:
-                    # Withdrawal
-                    response = requests.post(
-                        f"{self.base_url}/accounts/{account_number}/withdraw",
-                        json={"amount": 25.0}
-                    )
-                    operation = "withdrawal"
-                
-                end_time = time.time()
-                duration = end_time - start_time
+                response = await self.session.post(
+                    f"/accounts/{account_number}/{endpoint}",
+                    json={"amount": amount}
+                )
+                duration = time.time() - start_time
                 
                 if response.status_code == 200:
-                    data = response.json()
                     results.append({
                         "thread_id": thread_id,
-                        "account": account_number[:8],
+                        "account": account_number,
                         "operation": operation,
-                        "balance": data["new_balance"],
+                        "balance": response.json()["new_balance"],
                         "duration": duration,
                         "success": True
                     })
                 else:
                     results.append({
                         "thread_id": thread_id,
-                        "account": account_number[:8],
+                        "account": account_number,
                         "operation": operation,
                         "error": response.text,
                         "duration": duration,
@@ -106,74 +155,138 @@ class AdvancedThreadingTester:
                     })
                 
                 # Store timing data for analysis
-                self.timing_data[account_number].append(duration)
+                local_timings.append(duration)
                 
-                # Small delay to increase chance of race conditions
-                time.sleep(0.001)
+                # Optional small delay to increase chance of race conditions (set RACE_FUZZ=1)
+                if os.environ.get("RACE_FUZZ"):
+                    await asyncio.sleep(0.001)
                 
             except Exception as e:
-                end_time = time.time()
-                duration = end_time - start_time
                 results.append({
                     "thread_id": thread_id,
-                    "account": account_number[:8],
+                    "account": account_number,
                     "operation": operation,
                     "exception": str(e),
-                    "duration": duration,
+                    "duration": time.time() - start_time,
+                    "success": False
+                })
+        
+        return results, local_timings
+    
+    async def batch_transaction_worker(self, account_number: str, thread_id: int, num_transactions: int = 10):
+        """
+        Worker that performs multiple transactions on a single account in one batch request.
+        Returns (results, timings); timings holds the one batch round-trip time and is
+        merged into self.timing_data by the caller.
+        """
+        results = []
+        local_timings = []
+        
+        # Alternate between deposits and withdrawals
+        ops = [
+            {"op": "deposit", "amount": DEPOSIT_AMOUNT} if i % 2 == 0 else {"op": "withdraw", "amount": WITHDRAWAL_AMOUNT}
+            for i in range(num_transactions)
+        ]
+        
+        start_time = time.time()
+        
+        try:
+            response = await self.session.post(
+                f"/accounts/{account_number}/batch",
+                json={"ops": ops}
+            )
+            status_code = response.status_code
+            if status_code == 200:
+                data = response.json()
+            else:
+                error = response.text
+            
+            end_time = time.time()
+            # One round-trip covers every operation in the batch
+            batch_rtt = end_time - start_time
+            
+            if status_code == 200:
+                for op_result in data["results"]:
+                    results.append({
+                        "thread_id": thread_id,
+                        "account": account_number,
+                        "operation": op_result["transaction_type"],
+                        "balance": op_result["new_balance"],
+                        "success": op_result["success"]
+                    })
+            else:
+                for op in ops:
+                    results.append({
+                        "thread_id": thread_id,
+                        "account": account_number,
+                        "operation": "deposit" if op["op"] == "deposit" else "withdrawal",
+                        "error": error,
+                        "success": False
+                    })
+            
+            # Store timing data for analysis
+            local_timings.append(batch_rtt)
+            
+            # Optional small delay to increase chance of race conditions (set RACE_FUZZ=1)
+            if os.environ.get("RACE_FUZZ"):
+                await asyncio.sleep(0.001)
+            
+        except Exception as e:
+            for op in ops:
+                results.append({
+                    "thread_id": thread_id,
+                    "account": account_number,
+                    "operation": "deposit" if op["op"] == "deposit" else "withdrawal",
+                    "exception": str(e),
                     "success": False
                 })
         
-        return results
+        return results, local_timings
     
-    def test_same_account_serialization(self):
+    async def test_same_account_serialization(self):
         """Test that operations on the same account are properly serialized"""
         print(f"\n🔍 Testing same-account serialization...")
-        print(f"Running {CONCURRENT_THREADS} threads on 1 account...")
+        print(f"Running {CONCURRENT_THREADS} concurrent workers on 1 account...")
         
         if not self.accounts:
             print("❌ No accounts available for testing")
             return False
         
         # Use first account for this test
-        test_account = self.accounts[0]
+        test_account, _ = self.accounts[0]
         
         # Get initial balance
-        response = requests.get(f"{self.base_url}/accounts/{test_account}/balance")
-        initial_balance = response.json()["balance"]
+        initial_balance = await self.get_balance(test_account)
         print(f"Initial balance: ${initial_balance}")
         
         start_time = time.time()
         
-        # Run many concurrent threads on the same account
-        with ThreadPoolExecutor(max_workers=CONCURRENT_THREADS) as executor:
-            futures = []
-            for thread_id in range(CONCURRENT_THREADS):
-                future = executor.submit(
-                    self.transaction_worker, 
-                    test_account, 
-                    thread_id, 
-                    TRANSACTIONS_PER_ACCOUNT // CONCURRENT_THREADS + 1
-                )
-                futures.append(future)
-            
-            # Collect results
-            all_results = []
-            for future in as_completed(futures):
-                results = future.result()
-                all_results.extend(results)
+        # Run many concurrent workers on the same account
+        worker_results = await asyncio.gather(*(
+            self.transaction_worker(
+                test_account, 
+                thread_id, 
+                TRANSACTIONS_PER_ACCOUNT // CONCURRENT_THREADS + 1
+            )
+            for thread_id in range(CONCURRENT_THREADS)
+        ))
+        
+        # Collect results
+        all_results = []
+        for results, timings in worker_results:
+            all_results.extend(results)
+            self.timing_data[test_account].extend(timings)
         
         end_time = time.time()
         total_duration = end_time - start_time
         
         # Get final balance
-        response = requests.get(f"{self.base_url}/accounts/{test_account}/balance")
-        final_balance = response.json()["balance"]
+        final_balance = await self.get_balance(test_account)
         
         # Calculate expected balance
         successful_results = [r for r in all_results if r["success"]]
-        total_deposits = sum(50.0 for r in successful_results if r["operation"] == "deposit")
-        total_withdrawals = sum(25.0 for r in successful_results if r["operation"] == "withdrawal")
-        expected_balance = initial_balance + total_deposits - total_withdrawals
+        expected_cents = self.expected_balance_cents(initial_balance, successful_results)
+        expected_balance = expected_cents / 100
         
         print(f"Total duration: {total_duration:.2f}s")
         print(f"Successful transactions: {len(successful_results)}")
@@ -182,14 +295,14 @@ class AdvancedThreadingTester:
         print(f"Actual final balance: ${final_balance}")
         
         # Verify balance integrity
-        if abs(final_balance - expected_balance) < 0.01:
+        if round(final_balance * 100) == expected_cents:
             print("✅ Same-account serialization working correctly!")
             return True
         else:
             print("❌ Balance integrity violation in same-account test!")
             return False
     
-    def test_different_accounts_concurrency(self):
+    async def test_different_accounts_concurrency(self):
         """Test that operations on different accounts run concurrently"""
         print(f"\n🔍 Testing different-accounts concurrency...")
         print(f"Running operations across {len(self.accounts)} different accounts...")
@@ -204,37 +317,22 @@ class AdvancedThreadingTester:
         start_time = time.time()
         
         # Run operations on different accounts simultaneously
-        with ThreadPoolExecutor(max_workers=len(self.accounts)) as executor:
-            futures = {}
-            
-            for i, account in enumerate(self.accounts):
-                future = executor.submit(
-                    self.transaction_worker, 
-                    account, 
-                    i, 
-                    TRANSACTIONS_PER_ACCOUNT
-                )
-                futures[future] = account
-            
-            # Collect results and timing
-            for future in as_completed(futures):
-                account = futures[future]
-                results = future.result()
-                
-                # Calculate timing statistics for this account
-                successful_results = [r for r in results if r["success"]]
-                if successful_results:
-                    account_timings[account] = {
-                        "transactions": len(results),
-                        "avg_duration": statistics.mean([r["duration"] for r in successful_results]),
-                        "total_duration": sum(r["duration"] for r in successful_results)
-                    }
-                else:
-                    account_timings[account] = {
-                        "transactions": len(results),
-                        "avg_duration": 0.0,
-                        "total_duration": 0.0
-                    }
+        worker_results = await asyncio.gather(*(
+            self.batch_transaction_worker(
+                account, 
+                i, 
+                TRANSACTIONS_PER_ACCOUNT
+            )
+            for i, (account, _) in enumerate(self.accounts)
+        ))
+        
+        # Collect results and timing; each account's work is a single batch request
+        for (account, short), (results, timings) in zip(self.accounts, worker_results):
+            self.timing_data[account].extend(timings)
+            account_timings[account] = {
+                "transactions": len(results),
+                "batch_rtt": sum(timings)
+            }
         
         end_time = time.time()
         total_duration = end_time - start_time
@@ -244,11 +342,11 @@ class AdvancedThreadingTester:
         # Analyze concurrency
         print("\n📊 Per-account timing analysis:")
         total_sequential_time = 0
-        for account, timing in account_timings.items():
-            print(f"Account {account[:8]}: {timing['transactions']} transactions, "
-                  f"avg {timing['avg_duration']*1000:.1f}ms, "
-                  f"total {timing['total_duration']:.2f}s")
-            total_sequential_time += timing['total_duration']
+        for account, short in self.accounts:
+            timing = account_timings[account]
+            print(f"Account {short}: {timing['transactions']} transactions in one batch, "
+                  f"batch RTT {timing['batch_rtt']*1000:.1f}ms")
+            total_sequential_time += timing['batch_rtt']
         
         # Calculate concurrency effectiveness
         concurrency_ratio = total_sequential_time / total_duration if total_duration > 0 else 0
@@ -268,56 +366,48 @@ class AdvancedThreadingTester:
             print("⚠️ Limited concurrency detected - operations may be over-serialized")
             return True  # Still pass, but warn
     
-    def test_mixed_operations_integrity(self):
+    async def test_mixed_operations_integrity(self):
         """Test integrity with mixed operations across all accounts"""
         print(f"\n🔍 Testing mixed operations integrity...")
         
-        # Get initial balances
-        initial_balances = {}
-        for account in self.accounts:
-            response = requests.get(f"{self.base_url}/accounts/{account}/balance")
-            initial_balances[account] = response.json()["balance"]
-        
-        # Run mixed operations
-        with ThreadPoolExecutor(max_workers=len(self.accounts) * 2) as executor:
-            futures = []
-            
-            # Start multiple threads per account
-            for account in self.accounts:
-                for thread_id in range(2):  # 2 threads per account
-                    future = executor.submit(
-                        self.transaction_worker, 
-                        account, 
-                        thread_id, 
-                        TRANSACTIONS_PER_ACCOUNT // 2
-                    )
-                    futures.append(future)
-            
-            # Collect all results
-            all_results = []
-            for future in as_completed(futures):
-                results = future.result()
-                all_results.extend(results)
-        
-        # Verify final balances
+        # Get initial balances concurrently
+        balances = await asyncio.gather(*(self.get_balance(account) for account, _ in self.accounts))
+        initial_balances = {account: balance for (account, _), balance in zip(self.accounts, balances)}
+        
+        # Run mixed operations, 2 workers per account
+        workers = [(account, thread_id) for account, _ in self.accounts for thread_id in range(2)]
+        worker_results = await asyncio.gather(*(
+            self.batch_transaction_worker(
+                account, 
+                thread_id, 
+                TRANSACTIONS_PER_ACCOUNT // 2
+            )
+            for account, thread_id in workers
+        ))
+        
+        # Bucket successful results by account once
+        results_by_account = defaultdict(list)
+        for (account, _), (results, timings) in zip(workers, worker_results):
+            self.timing_data[account].extend(timings)
+            for r in results:
+                if r["success"]:
+                    results_by_account[r["account"]].append(r)
+        
+        # Verify final balances, fetched concurrently once every worker has finished
         print("🔍 Verifying final balances...")
         integrity_check = True
+        final_balances = await asyncio.gather(*(self.get_balance(account) for account, _ in self.accounts))
         
-        for account in self.accounts:
-            # Get final balance
-            response = requests.get(f"{self.base_url}/accounts/{account}/balance")
-            final_balance = response.json()["balance"]
-            
+        for (account, short), final_balance in zip(self.accounts, final_balances):
             # Calculate expected balance for this account
-            account_results = [r for r in all_results if r["account"] == account[:8] and r["success"]]
-            deposits = sum(50.0 for r in account_results if r["operation"] == "deposit")
-            withdrawals = sum(25.0 for r in account_results if r["operation"] == "withdrawal")
-            expected_balance = initial_balances[account] + deposits - withdrawals
+            account_results = results_by_account[account]
+            expected_cents = self.expected_balance_cents(initial_balances[account], account_results)
+            expected_balance = expected_cents / 100
             
-            print(f"Account {account[:8]}: Expected ${expected_balance}, Actual ${final_balance}")
+            print(f"Account {short}: Expected ${expected_balance}, Actual ${final_balance}")
             
-            if abs(final_balance - expected_balance) > 0.01:
-                print(f"❌ Balance mismatch for account {account[:8]}!")
+            if round(final_balance * 100) != expected_cents:
+                print(f"❌ Balance mismatch for account {short}!")
                 integrity_check = False
         
         if integrity_check:
@@ -327,28 +417,123 @@ class AdvancedThreadingTester:
             print("❌ Mixed operations integrity violated!")
             return False
     
-    def run_advanced_threading_tests(self):
-        """Run comprehensive threading tests"""
-        print("🚀 Starting Advanced Thread Safety Tests...\n")
+    async def test_batch_serialization(self):
+        """Test that concurrent batch requests on the same account are serialized"""
+        print(f"\n🔍 Testing same-account batch serialization...")
+        print(f"Running {CONCURRENT_THREADS} concurrent batch requests on 1 account...")
+        
+        if not self.accounts:
+            print("❌ No accounts available for testing")
+            return False
+        
+        test_account, _ = self.accounts[0]
+        initial_balance = await self.get_balance(test_account)
+        
+        worker_results = await asyncio.gather(*(
+            self.batch_transaction_worker(test_account, thread_id, TRANSACTIONS_PER_ACCOUNT)
+            for thread_id in range(CONCURRENT_THREADS)
+        ))
+        
+        all_results = []
+        for results, timings in worker_results:
+            all_results.extend(results)
+            self.timing_data[test_account].extend(timings)
+        
+        final_balance = await self.get_balance(test_account)
+        successful_results = [r for r in all_results if r["success"]]
+        expected_cents = self.expected_balance_cents(initial_balance, successful_results)
+        
+        print(f"Successful transactions: {len(successful_results)}")
+        print(f"Failed transactions: {len(all_results) - len(successful_results)}")
+        print(f"Expected final balance: ${expected_cents / 100}")
+        print(f"Actual final balance: ${final_balance}")
+        
+        if round(final_balance * 100) == expected_cents:
+            print("✅ Same-account batch serialization working correctly!")
+            return True
+        else:
+            print("❌ Balance integrity violation in batch test!")
+            return False
+    
+    async def test_batch_validation(self):
+        """Test that malformed batch requests are rejected without touching the balance"""
+        print(f"\n🔍 Testing batch request validation...")
         
-        # Setup
-        if not self.setup_multiple_accounts():
+        if not self.accounts:
+            print("❌ No accounts available for testing")
             return False
         
+        test_account, _ = self.accounts[0]
+        initial_balance = await self.get_balance(test_account)
+        
+        deposit = {"op": "deposit", "amount": DEPOSIT_AMOUNT}
+        cases = {
+            "empty ops list": [],
+            f"more than {MAX_BATCH_OPERATIONS} ops": [deposit] * (MAX_BATCH_OPERATIONS + 1),
+            "unknown op": [deposit, {"op": "transfer", "amount": DEPOSIT_AMOUNT}],
+        }
+        responses = await asyncio.gather(*(
+            self.session.post(f"/accounts/{test_account}/batch", json={"ops": ops})
+            for ops in cases.values()
+        ))
+        
+        valid = True
+        for name, response in zip(cases, responses):
+            if response.status_code == 422:
+                print(f"✅ Rejected {name}")
+            else:
+                print(f"❌ Expected 422 for {name}, got {response.status_code}")
+                valid = False
+        
+        final_balance = await self.get_balance(test_account)
+        if final_balance != initial_balance:
+            print(f"❌ Rejected batches changed the balance: ${initial_balance} -> ${final_balance}")
+            valid = False
+        
+        if valid:
+            print("✅ Batch validation working correctly!")
+        return valid
+    
+    async def run_advanced_threading_tests(self):
+        """Run comprehensive threading tests"""
+        print("🚀 Starting Advanced Thread Safety Tests...\n")
+        
+        # One client drives every concurrent worker from a single thread. Against an
+        # HTTP/2 server (e.g. hypercorn over TLS) all workers multiplex over a single
+        # connection; against HTTP/1.1 (uvicorn) it falls back to a pool of POOL_SIZE
+        limits = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+        async with httpx.AsyncClient(http2=True, base_url=self.base_url, limits=limits) as session:
+            self.session = session
+            return await self._run_tests()
+    
+    async def _run_tests(self):
+        """Run the test cases against the open session"""
         tests_passed = 0
-        total_tests = 3
+        total_tests = 5
         
         try:
+            # Setup (inside try so partially created accounts are still cleaned up)
+            if not await self.setup_multiple_accounts():
+                return False
+            
             # Test 1: Same account serialization
-            if self.test_same_account_serialization():
+            if await self.test_same_account_serialization():
                 tests_passed += 1
             
             # Test 2: Different accounts concurrency
-            if self.test_different_accounts_concurrency():
+            if await self.test_different_accounts_concurrency():
                 tests_passed += 1
             
             # Test 3: Mixed operations integrity
-            if self.test_mixed_operations_integrity():
+            if await self.test_mixed_operations_integrity():
+                tests_passed += 1
+            
+            # Test 4: Same account batch serialization
+            if await self.test_batch_serialization():
+                tests_passed += 1
+            
+            # Test 5: Batch request validation
+            if await self.test_batch_validation():
                 tests_passed += 1
             
             # Summary
@@ -359,6 +544,7 @@ class AdvancedThreadingTester:
                 print("✅ Same-account operations are properly serialized")
                 print("✅ Different-account operations run concurrently")
                 print("✅ All operations maintain data integrity")
+                print("✅ Batch requests are serialized and validated")
                 return True
             else:
                 print("⚠️ Some advanced threading tests failed.")
@@ -366,7 +552,7 @@ class AdvancedThreadingTester:
                 
         finally:
             # Cleanup
-            self.cleanup_accounts()
+            await self.cleanup_accounts()
 
 def main():
     """Main function"""
@@ -384,7 +570,7 @@ def main():
         return
     
     tester = AdvancedThreadingTester()
-    success = tester.run_advanced_threading_tests()
+    success = asyncio.run(tester.run_advanced_threading_tests())
     
     exit(0 if success else 1)
 
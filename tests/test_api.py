@@ -4,425 +4,692 @@ Test script for the ATM System API
 This script tests all endpoints and demonstrates the API functionality.
 """
 
+import asyncio
 import requests
-import json
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import sys
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Generator, List, NamedTuple, Optional, Union
 
 # Configuration
 BASE_URL = "http://localhost:8000"  # FastAPI direct port, change to deployed URL for cloud testing
+MAX_TRANSACTION_AMOUNT = 10000.0  # Default from settings
 
-class ATMTester:
+# Creates in flight at once during the MAX_ACCOUNTS storm
+STORM_WAVE_SIZE = 32
+# Deletes in flight at once while cleaning up leftover accounts
+CLEANUP_CONCURRENCY = 16
+
+class _Request(NamedTuple):
+    """One API call made by a test flow; body is pre-serialized JSON"""
+    method: str
+    path: str
+    body: Optional[bytes] = None
+
+# A test flow yields a request (or a list of them, sent concurrently) and is sent the response(s)
+Flow = Generator[Union[_Request, List[_Request]], Any, Any]
+# A test: given the list to write its output lines into, returns the flow to drive
+Test = Callable[[List[str]], Flow]
+
+# Pre-serialized request for the bulk account creation in test_max_accounts_limit
+MAX_ACCOUNTS_REQUEST = _Request("POST", "/accounts", b'{"initial_balance": 10.0}')
+
+def _print_output(lines: List[str]):
+    """Print the output lines one test collected"""
+    if lines:
+        print("\n".join(lines))
+
+class _CreateStorm:
+    """Progress of the MAX_ACCOUNTS account-creation storm, sent in bounded waves"""
+    
+    def __init__(self, tester: "_ATMTesterBase", accounts_to_create: int, wave_size: int = STORM_WAVE_SIZE):
+        self.tester = tester
+        self.remaining = accounts_to_create
+        self.wave_size = wave_size
+        self.created_count = 0
+        self.limit_hit = False
+        self.unexpected = None
+    
+    def next_wave(self) -> int:
+        """Size of the next wave; 0 once the limit, an unexpected response or the total is reached"""
+        if self.limit_hit or self.unexpected is not None:
+            return 0
+        size = min(self.wave_size, self.remaining)
+        self.remaining -= size
+        return size
+    
+    def record(self, response):
+        """Tally one create response"""
+        if response.status_code == 201:
+            # Record every created account (even after the limit) so cleanup removes it
+            self.created_count += 1
+            self.tester.created_accounts.add(orjson.loads(response.content)["account_number"])
+        elif (response.status_code == 507
+              and "Maximum number of accounts" in orjson.loads(response.content).get('detail', '')):
+            self.limit_hit = True
+        elif self.unexpected is None:
+            self.unexpected = response
+    
+    def report(self, out: List[str]) -> bool:
+        """Print the outcome and return whether the test passed"""
+        if self.unexpected is not None:
+            out.append(f"❌ Unexpected response: {self.unexpected.status_code} - {self.unexpected.text}")
+            return False
+        
+        if self.limit_hit:
+            out.append(f"✅ MAX_ACCOUNTS limit enforced after {self.created_count} accounts")
+            return True
+        
+        out.append(f"⚠️ Created {self.created_count} accounts but limit not reached")
+        return True
+
+class _ATMTesterBase:
+    """
+    Test flows, state and response checks shared by ATMTester and AsyncATMTester.
+    The checks only use status_code, content and text, which requests and httpx
+    responses both provide.
+    """
+    
     def __init__(self, base_url: str = BASE_URL):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.created_accounts = []
+        # Concurrent stages add to this set and cleanup discards from it without a lock:
+        # set.add and set.discard are each atomic under the GIL
+        self.created_accounts = set()
+        # Latest balance seen per account, from balance/deposit/withdraw responses
+        self._last_balance: dict = {}
+        # Last /health payload seen by test_health_check, reused by test_max_accounts_limit
+        self._last_health: Optional[dict] = None
+    
+    def _check_health(self, out: List[str], response) -> bool:
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            self._last_health = data
+            out.append(f"✅ Health check passed: {data}")
+            return True
+        out.append(f"❌ Health check failed: {response.status_code}")
+        return False
+    
+    def _check_create_account(self, out: List[str], response, quiet: bool) -> Optional[str]:
+        if response.status_code == 201:
+            data = orjson.loads(response.content)
+            account_number = data["account_number"]
+            self.created_accounts.add(account_number)
+            if not quiet:
+                out.append(f"✅ Account created: {account_number} with balance {data['balance']}")
+            return account_number
+        out.append(f"❌ Account creation failed: {response.status_code} - {response.text}")
+        return None
+    
+    def _check_get_balance(self, out: List[str], account_number: str, response) -> Optional[float]:
+        if response.status_code == 200:
+            balance = orjson.loads(response.content)["balance"]
+            self._last_balance[account_number] = balance
+            out.append(f"✅ Balance retrieved: {balance}")
+            return balance
+        out.append(f"❌ Get balance failed: {response.status_code} - {response.text}")
+        return None
+    
+    def _check_transaction(self, out: List[str], account_number: str, response, label: str) -> bool:
+        """Check a deposit or withdrawal response; label is "Deposit" or "Withdrawal" """
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            self._last_balance[account_number] = data["new_balance"]
+            out.append(f"✅ {label} successful: New balance {data['new_balance']}")
+            return True
+        out.append(f"❌ {label} failed: {response.status_code} - {response.text}")
+        return False
+    
+    def _check_insufficient_funds(self, out: List[str], response) -> bool:
+        if response.status_code == 400:
+            out.append("✅ Insufficient funds check working correctly")
+            return True
+        out.append(f"❌ Expected 400 status, got {response.status_code}")
+        return False
+    
+    def _check_invalid_account(self, out: List[str], response) -> bool:
+        if response.status_code == 404:
+            out.append("✅ Invalid account handling working correctly")
+            return True
+        out.append(f"❌ Expected 404 status, got {response.status_code}")
+        return False
+    
+    def _check_list_accounts(self, out: List[str], response) -> bool:
+        if response.status_code == 200:
+            out.append(f"✅ Accounts listed: {orjson.loads(response.content)['total_accounts']} accounts")
+            return True
+        out.append(f"❌ List accounts failed: {response.status_code}")
+        return False
+    
+    def _check_delete_account(self, out: List[str], account_number: str, response, quiet: bool) -> bool:
+        if response.status_code == 204:
+            if not quiet:
+                out.append("✅ Account deleted successfully")
+            self.created_accounts.discard(account_number)
+            return True
+        out.append(f"❌ Account deletion failed: {response.status_code}")
+        return False
+    
+    def _check_rate_limiting(self, out: List[str], statuses: List[int]) -> bool:
+        if 429 in statuses:
+            out.append("✅ Rate limiting is working")
+        else:
+            out.append("⚠️ Rate limiting not triggered (may need more requests)")
+        return True
+    
+    def _accounts_to_create(self, out: List[str], health_data: dict) -> int:
+        """Number of creates needed to pass MAX_ACCOUNTS, or 0 if already at the limit"""
+        current_count = health_data.get('accounts_count', 0)
+        max_accounts = health_data.get('max_accounts', 1000)
+        
+        out.append(f"   Current accounts: {current_count}")
+        out.append(f"   Max accounts: {max_accounts}")
+        
+        # If we're already at the limit, we can't test this
+        if current_count >= max_accounts:
+            out.append("⚠️ Already at max accounts limit, cannot test")
+            return 0
+        
+        accounts_to_create = max_accounts - current_count + 1
+        out.append(f"   Attempting to create {accounts_to_create} accounts to test limit...")
+        return accounts_to_create
+    
+    def _check_max_transaction(self, out: List[str], response, operation: str) -> bool:
+        """Check an over-limit deposit/withdrawal was rejected; operation is "deposit" or "withdrawal" """
+        if response.status_code != 400:
+            out.append(f"❌ Expected 400 error but got {response.status_code}")
+            return False
+        error_data = orjson.loads(response.content)
+        if "Maximum transaction amount" not in error_data.get('detail', ''):
+            out.append(f"❌ Unexpected 400 error: {error_data}")
+            return False
+        out.append(f"✅ MAX_TRANSACTION_AMOUNT limit enforced for {operation}")
+        return True
+    
+    # Test flows. Each one is a generator: it yields the _Request (or list of _Requests,
+    # sent concurrently as a burst) it needs and is sent back the response (or list of
+    # responses). Transport errors are thrown in at the yield, so each flow's own
+    # except clause reports them. Subclasses drive the flows over their HTTP client.
+    # Output goes into `out`, the test's own list of lines, and the runner prints it,
+    # so tests running concurrently never interleave; the checks above do the same.
     
-    def test_health_check(self) -> bool:
+    def test_health_check(self, out: List[str]) -> Flow:
         """Test the health check endpoint"""
-        print("🔍 Testing health check...")
+        out.append("🔍 Testing health check...")
         try:
-            response = self.session.get(f"{self.base_url}/health")
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ Health check passed: {data}")
-                return True
-            else:
-                print(f"❌ Health check failed: {response.status_code}")
-                return False
+            return self._check_health(out, (yield _Request("GET", "/health")))
         except Exception as e:
-            print(f"❌ Health check error: {e}")
+            out.append(f"❌ Health check error: {e}")
             return False
     
-    def test_create_account(self, initial_balance: float = 100.0) -> Optional[str]:
-        """Test account creation"""
-        print(f"🔍 Testing account creation with balance {initial_balance}...")
+    def test_create_account(self, out: List[str], initial_balance: float = 100.0, quiet: bool = False) -> Flow:
+        """Test account creation; quiet suppresses progress output for bulk use"""
+        if not quiet:
+            out.append(f"🔍 Testing account creation with balance {initial_balance}...")
         try:
-            payload = {"initial_balance": initial_balance}
-            response = self.session.post(f"{self.base_url}/accounts", json=payload)
-            
-            if response.status_code == 201:
-                data = response.json()
-                account_number = data["account_number"]
-                self.created_accounts.append(account_number)
-                print(f"✅ Account created: {account_number} with balance {data['balance']}")
-                return account_number
-            else:
-                print(f"❌ Account creation failed: {response.status_code} - {response.text}")
-                return None
+            body = orjson.dumps({"initial_balance": initial_balance})
+            return self._check_create_account(out, (yield _Request("POST", "/accounts", body)), quiet)
         except Exception as e:
-            print(f"❌ Account creation error: {e}")
+            out.append(f"❌ Account creation error: {e}")
             return None
     
-    def test_get_balance(self, account_number: str) -> Optional[float]:
+    def test_get_balance(self, out: List[str], account_number: str) -> Flow:
         """Test getting account balance"""
-        print(f"🔍 Testing get balance for account {account_number}...")
+        out.append(f"🔍 Testing get balance for account {account_number}...")
         try:
-            response = self.session.get(f"{self.base_url}/accounts/{account_number}/balance")
-            
-            if response.status_code == 200:
-                data = response.json()
-                balance = data["balance"]
-                print(f"✅ Balance retrieved: {balance}")
-                return balance
-            else:
-                print(f"❌ Get balance failed: {response.status_code} - {response.text}")
-                return None
+            response = yield _Request("GET", f"/accounts/{account_number}/balance")
+            return self._check_get_balance(out, account_number, response)
         except Exception as e:
-            print(f"❌ Get balance error: {e}")
+            out.append(f"❌ Get balance error: {e}")
             return None
     
-    def test_deposit(self, account_number: str, amount: float) -> bool:
+    def test_deposit(self, out: List[str], account_number: str, amount: float) -> Flow:
         """Test deposit operation"""
-        print(f"🔍 Testing deposit of {amount} to account {account_number}...")
+        out.append(f"🔍 Testing deposit of {amount} to account {account_number}...")
         try:
-            payload = {"amount": amount}
-            response = self.session.post(f"{self.base_url}/accounts/{account_number}/deposit", json=payload)
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ Deposit successful: New balance {data['new_balance']}")
-                return True
-            else:
-                print(f"❌ Deposit failed: {response.status_code} - {response.text}")
-                return False
+            body = orjson.dumps({"amount": amount})
+            response = yield _Request("POST", f"/accounts/{account_number}/deposit", body)
+            return self._check_transaction(out, account_number, response, "Deposit")
         except Exception as e:
-            print(f"❌ Deposit error: {e}")
+            out.append(f"❌ Deposit error: {e}")
             return False
     
-    def test_withdraw(self, account_number: str, amount: float) -> bool:
+    def test_withdraw(self, out: List[str], account_number: str, amount: float) -> Flow:
         """Test withdrawal operation"""
-        print(f"🔍 Testing withdrawal of {amount} from account {account_number}...")
+        out.append(f"🔍 Testing withdrawal of {amount} from account {account_number}...")
         try:
-            payload = {"amount": amount}
-            response = self.session.post(f"{self.base_url}/accounts/{account_number}/withdraw", json=payload)
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ Withdrawal successful: New balance {data['new_balance']}")
-                return True
-            else:
-                print(f"❌ Withdrawal failed: {response.status_code} - {response.text}")
-                return False
+            body = orjson.dumps({"amount": amount})
+            response = yield _Request("POST", f"/accounts/{account_number}/withdraw", body)
+            return self._check_transaction(out, account_number, response, "Withdrawal")
         except Exception as e:
-            print(f"❌ Withdrawal error: {e}")
+            out.append(f"❌ Withdrawal error: {e}")
             return False
     
-    def test_insufficient_funds(self, account_number: str) -> bool:
+    def test_insufficient_funds(self, out: List[str], account_number: str, current_balance: Optional[float] = None) -> Flow:
         """Test withdrawal with insufficient funds"""
-        print(f"🔍 Testing insufficient funds scenario...")
+        out.append("🔍 Testing insufficient funds scenario...")
         
-        # Get current balance first
-        current_balance = self.test_get_balance(account_number)
+        # Use the balance from an earlier response on this account; only fetch it if none was seen
         if current_balance is None:
-            return False
+            current_balance = self._last_balance.get(account_number)
+        if current_balance is None:
+            current_balance = yield from self.test_get_balance(out, account_number)
+            if current_balance is None:
+                return False
         
         # Try to withdraw more than available
         try:
-            payload = {"amount": current_balance + 1000}
-            response = self.session.post(f"{self.base_url}/accounts/{account_number}/withdraw", json=payload)
-            
-            if response.status_code == 400:
-                print("✅ Insufficient funds check working correctly")
-                return True
-            else:
-                print(f"❌ Expected 400 status, got {response.status_code}")
-                return False
+            body = orjson.dumps({"amount": current_balance + 1})
+            response = yield _Request("POST", f"/accounts/{account_number}/withdraw", body)
+            return self._check_insufficient_funds(out, response)
         except Exception as e:
-            print(f"❌ Insufficient funds test error: {e}")
+            out.append(f"❌ Insufficient funds test error: {e}")
             return False
     
-    def test_invalid_account(self) -> bool:
+    def test_invalid_account(self, out: List[str]) -> Flow:
         """Test operations on non-existent account"""
-        print("🔍 Testing invalid account scenario...")
+        out.append("🔍 Testing invalid account scenario...")
         fake_account = "00000000-0000-0000-0000-000000000000"
         
         try:
-            response = self.session.get(f"{self.base_url}/accounts/{fake_account}/balance")
-            
-            if response.status_code == 404:
-                print("✅ Invalid account handling working correctly")
-                return True
-            else:
-                print(f"❌ Expected 404 status, got {response.status_code}")
-                return False
+            return self._check_invalid_account(out, (yield _Request("GET", f"/accounts/{fake_account}/balance")))
         except Exception as e:
-            print(f"❌ Invalid account test error: {e}")
+            out.append(f"❌ Invalid account test error: {e}")
             return False
     
-    def test_list_accounts(self) -> bool:
+    def test_list_accounts(self, out: List[str]) -> Flow:
         """Test listing all accounts"""
-        print("🔍 Testing list accounts...")
+        out.append("🔍 Testing list accounts...")
         try:
-            response = self.session.get(f"{self.base_url}/accounts")
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ Accounts listed: {data['total_accounts']} accounts")
-                return True
-            else:
-                print(f"❌ List accounts failed: {response.status_code}")
-                return False
+            return self._check_list_accounts(out, (yield _Request("GET", "/accounts")))
         except Exception as e:
-            print(f"❌ List accounts error: {e}")
+            out.append(f"❌ List accounts error: {e}")
             return False
     
-    def test_delete_account(self, account_number: str) -> bool:
-        """Test account deletion"""
-        print(f"🔍 Testing account deletion for {account_number}...")
+    def test_delete_account(self, out: List[str], account_number: str, quiet: bool = False) -> Flow:
+        """Test account deletion; quiet suppresses progress output for bulk use"""
+        if not quiet:
+            out.append(f"🔍 Testing account deletion for {account_number}...")
         try:
-            response = self.session.delete(f"{self.base_url}/accounts/{account_number}")
-            
-            if response.status_code == 204:
-                print("✅ Account deleted successfully")
-                if account_number in self.created_accounts:
-                    self.created_accounts.remove(account_number)
-                return True
-            else:
-                print(f"❌ Account deletion failed: {response.status_code}")
-                return False
+            response = yield _Request("DELETE", f"/accounts/{account_number}")
+            return self._check_delete_account(out, account_number, response, quiet)
         except Exception as e:
-            print(f"❌ Account deletion error: {e}")
+            out.append(f"❌ Account deletion error: {e}")
             return False
     
-    def test_rate_limiting(self) -> bool:
+    def test_rate_limiting(self, out: List[str]) -> Flow:
         """Test rate limiting by making rapid requests"""
-        print("🔍 Testing rate limiting...")
+        out.append("🔍 Testing rate limiting...")
         try:
-            # Make rapid requests to trigger rate limiting
-            for i in range(15):
-                response = self.session.get(f"{self.base_url}/health")
-                if response.status_code == 429:
-                    print("✅ Rate limiting is working")
-                    return True
-                time.sleep(0.1)
-            
-            print("⚠️ Rate limiting not triggered (may need more requests)")
-            return True
+            # Send the requests as one concurrent burst so a limiter actually sees it
+            responses = yield [_Request("GET", "/health")] * 15
+            return self._check_rate_limiting(out, [response.status_code for response in responses])
         except Exception as e:
-            print(f"❌ Rate limiting test error: {e}")
+            out.append(f"❌ Rate limiting test error: {e}")
             return False
     
-    def test_max_accounts_limit(self) -> bool:
+    def test_max_accounts_limit(self, out: List[str]) -> Flow:
         """Test that the system enforces MAX_ACCOUNTS limit"""
-        print("🔍 Testing MAX_ACCOUNTS limit...")
+        out.append("🔍 Testing MAX_ACCOUNTS limit...")
         try:
-            # First, check current account count
-            response = self.session.get(f"{self.base_url}/health")
-            if response.status_code != 200:
-                print(f"❌ Cannot check health status: {response.status_code}")
-                return False
-            
-            health_data = response.json()
-            current_count = health_data.get('accounts_count', 0)
-            max_accounts = health_data.get('max_accounts', 1000)
-            
-            print(f"   Current accounts: {current_count}")
-            print(f"   Max accounts: {max_accounts}")
+            # Reuse the health check payload when there is one. Its accounts_count may
+            # predate later creates, which only means a few extra (rejected) attempts.
+            health_data = self._last_health
+            if health_data is None:
+                response = yield _Request("GET", "/health")
+                if response.status_code != 200:
+                    out.append(f"❌ Cannot check health status: {response.status_code}")
+                    return False
+                health_data = orjson.loads(response.content)
             
-            # If we're already at the limit, we can't test this
-            if current_count >= max_accounts:
-                print("⚠️ Already at max accounts limit, cannot test")
+            accounts_to_create = self._accounts_to_create(out, health_data)
+            if not accounts_to_create:
                 return True
             
-            # Try to create accounts until we hit the limit
-            accounts_to_create = max_accounts - current_count + 1
-            print(f"   Attempting to create {accounts_to_create} accounts to test limit...")
-            
-            created_count = 0
-            for i in range(accounts_to_create):
-                payload = {"initial_balance": 10.0}
-                response = self.session.post(f"{self.base_url}/accounts", json=payload)
-                
-                if response.status_code == 201:
-                    created_count += 1
-                    account_data = response.json()
-                    self.created_accounts.append(account_data["account_number"])
-                elif response.status_code == 400:
-                    error_data = response.json()
-                    if "Maximum number of accounts" in error_data.get('detail', ''):
-                        print(f"✅ MAX_ACCOUNTS limit enforced after {created_count} accounts")
-                        return True
-                    else:
-                        print(f"❌ Unexpected 400 error: {error_data}")
-                        return False
-                else:
-                    print(f"❌ Unexpected response: {response.status_code} - {response.text}")
-                    return False
-            
-            print(f"⚠️ Created {created_count} accounts but limit not reached")
-            return True
+            # Send the creates in bursts of one wave each, and stop once the limit (or an
+            # unexpected status) shows up. Each wave is fully answered before the next.
+            storm = _CreateStorm(self, accounts_to_create)
+            size = storm.next_wave()
+            while size:
+                for response in (yield [MAX_ACCOUNTS_REQUEST] * size):
+                    storm.record(response)
+                size = storm.next_wave()
             
+            return storm.report(out)
+        
         except Exception as e:
-            print(f"❌ MAX_ACCOUNTS test error: {e}")
+            out.append(f"❌ MAX_ACCOUNTS test error: {e}")
             return False
     
-    def test_max_transaction_amount(self) -> bool:
+    def test_max_transaction_amount(self, out: List[str]) -> Flow:
         """Test that the system enforces MAX_TRANSACTION_AMOUNT limit"""
-        print("🔍 Testing MAX_TRANSACTION_AMOUNT limit...")
+        out.append("🔍 Testing MAX_TRANSACTION_AMOUNT limit...")
         try:
             # Create a test account with sufficient balance
-            account = self.test_create_account(20000.0)
+            account = yield from self.test_create_account(out, 20000.0)
             if not account:
-                print("❌ Cannot test transaction limit without a valid account")
+                out.append("❌ Cannot test transaction limit without a valid account")
                 return False
             
-            # Try to deposit more than the maximum allowed
-            max_amount = 10000.0  # Default from settings
-            test_amount = max_amount + 1000.0
-            
-            print(f"   Testing deposit of {test_amount} (max allowed: {max_amount})...")
-            
-            payload = {"amount": test_amount}
-            response = self.session.post(f"{self.base_url}/accounts/{account}/deposit", json=payload)
-            
-            if response.status_code == 400:
-                error_data = response.json()
-                if "Maximum transaction amount" in error_data.get('detail', ''):
-                    print(f"✅ MAX_TRANSACTION_AMOUNT limit enforced for deposit")
-                else:
-                    print(f"❌ Unexpected 400 error: {error_data}")
+            # Try to deposit, then withdraw, more than the maximum allowed
+            test_amount = MAX_TRANSACTION_AMOUNT + 1000.0
+            body = orjson.dumps({"amount": test_amount})
+            for endpoint, operation in (("deposit", "deposit"), ("withdraw", "withdrawal")):
+                out.append(f"   Testing {operation} of {test_amount} (max allowed: {MAX_TRANSACTION_AMOUNT})...")
+                response = yield _Request("POST", f"/accounts/{account}/{endpoint}", body)
+                if not self._check_max_transaction(out, response, operation):
                     return False
-            else:
-                print(f"❌ Expected 400 error but got {response.status_code}")
-                return False
-            
-            # Try to withdraw more than the maximum allowed
-            print(f"   Testing withdrawal of {test_amount} (max allowed: {max_amount})...")
-            
-            response = self.session.post(f"{self.base_url}/accounts/{account}/withdraw", json=payload)
-            
-            if response.status_code == 400:
-                error_data = response.json()
-                if "Maximum transaction amount" in error_data.get('detail', ''):
-                    print(f"✅ MAX_TRANSACTION_AMOUNT limit enforced for withdrawal")
-                    return True
-                else:
-                    print(f"❌ Unexpected 400 error: {error_data}")
-                    return False
-            else:
-                print(f"❌ Expected 400 error but got {response.status_code}")
-                return False
-                
+            return True
+        
         except Exception as e:
-            print(f"❌ MAX_TRANSACTION_AMOUNT test error: {e}")
+            out.append(f"❌ MAX_TRANSACTION_AMOUNT test error: {e}")
             return False
     
-    def run_comprehensive_test(self):
-        """Run all tests in sequence"""
-        print("🚀 Starting comprehensive ATM API tests...\n")
-        
-        tests_passed = 0
-        total_tests = 0
-        
-        # Test 1: Health check
-        total_tests += 1
-        if self.test_health_check():
-            tests_passed += 1
-        print()
+    def _report_results(self, results: List[Any], total_tests: int):
+        tests_passed = sum(1 for result in results if result)
         
-        # Test 2: Create account
-        total_tests += 1
-        account1 = self.test_create_account(500.0)
-        if account1:
-            tests_passed += 1
-        print()
-        
-        if not account1:
-            print("❌ Cannot continue tests without a valid account")
-            return
-        
-        # Test 3: Get balance
-        total_tests += 1
-        if self.test_get_balance(account1):
-            tests_passed += 1
-        print()
-        
-        # Test 4: Deposit money
-        total_tests += 1
-        if self.test_deposit(account1, 250.0):
-            tests_passed += 1
-        print()
+        # Summary
+        print(f"📊 Test Results: {tests_passed}/{total_tests} tests passed")
         
-        # Test 5: Withdraw money
-        total_tests += 1
-        if self.test_withdraw(account1, 100.0):
-            tests_passed += 1
-        print()
+        if tests_passed == total_tests:
+            print("🎉 All tests passed! The ATM API is working correctly.")
+        else:
+            print("⚠️ Some tests failed. Please check the API implementation.")
+    
+    def _report_cleanup(self, deleted: int, total: int):
+        # Failures print individually; successes are summarised here
+        print(f"🧹 Cleaned up {deleted}/{total} remaining accounts")
+
+class ATMTester(_ATMTesterBase):
+    """Drives the shared test flows over a pooled requests.Session, running stages on threads"""
+    
+    def __init__(self, base_url: str = BASE_URL):
+        super().__init__(base_url)
+        self.session = requests.Session()
+        # Pool large enough for the concurrent test stages; retries only apply to
+        # idempotent methods (urllib3 never retries POST by default)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Bodies are pre-serialized with orjson and sent as data=, so the content type is set once here
+        self.session.headers["Content-Type"] = "application/json"
+        # Sends the requests of a burst concurrently; worker threads start on demand
+        self._burst_executor = ThreadPoolExecutor(max_workers=STORM_WAVE_SIZE)
+    
+    def _send(self, request: _Request) -> requests.Response:
+        return self.session.request(request.method, f"{self.base_url}{request.path}", data=request.body)
+    
+    def _send_burst(self, burst: List[_Request]) -> List[requests.Response]:
+        """Send a burst concurrently and return the responses in request order"""
+        # A burst repeats the same request (the rate-limit probes, a MAX_ACCOUNTS wave), so
+        # each distinct one is prepared once. send() skips the proxy/verify/cert lookup that
+        # request() does, so the environment settings are resolved once alongside it.
+        prepared = {}
+        for request in burst:
+            if request not in prepared:
+                ready = self.session.prepare_request(
+                    requests.Request(request.method, f"{self.base_url}{request.path}", data=request.body)
+                )
+                prepared[request] = (ready, self.session.merge_environment_settings(ready.url, {}, None, None, None))
         
-        # Test 6: Insufficient funds
-        total_tests += 1
-        if self.test_insufficient_funds(account1):
-            tests_passed += 1
-        print()
+        futures = [
+            self._burst_executor.submit(self.session.send, ready, **send_kwargs)
+            for ready, send_kwargs in (prepared[request] for request in burst)
+        ]
+        return [future.result() for future in futures]
+    
+    def _drive(self, flow: Flow) -> Any:
+        """Run a test flow to completion over the session and return its result"""
+        try:
+            request = next(flow)
+            while True:
+                try:
+                    if isinstance(request, list):
+                        response = self._send_burst(request)
+                    else:
+                        response = self._send(request)
+                except Exception as e:
+                    request = flow.throw(e)
+                else:
+                    request = flow.send(response)
+        except StopIteration as stop:
+            return stop.value
+    
+    def _run_stage(self, executor: ThreadPoolExecutor, tests: List[Test]) -> List[Any]:
+        """
+        Run independent tests concurrently and return their results in submission order.
+        Each test writes its output lines into its own list, which the main thread prints
+        in the same order as it collects the results, so a raising test still shows its output.
+        """
+        outputs = [[] for _ in tests]
+        futures = [executor.submit(self._drive, test(out)) for test, out in zip(tests, outputs)]
+        results = []
+        for future, out in zip(futures, outputs):
+            try:
+                results.append(future.result())
+            finally:
+                _print_output(out)
+        return results
+    
+    def _account_operations(self, out: List[str], account_number: str) -> Flow:
+        """Balance, deposit, withdraw and insufficient-funds checks; these must stay ordered"""
+        return [
+            (yield from self.test_get_balance(out, account_number)),
+            (yield from self.test_deposit(out, account_number, 250.0)),
+            (yield from self.test_withdraw(out, account_number, 100.0)),
+            (yield from self.test_insufficient_funds(out, account_number)),
+        ]
+    
+    def run_comprehensive_test(self):
+        """Run all tests, dispatching independent tests concurrently in dependency stages"""
+        print("🚀 Starting comprehensive ATM API tests...\n")
         
-        # Test 7: Invalid account
-        total_tests += 1
-        if self.test_invalid_account():
-            tests_passed += 1
-        print()
+        total_tests = 13
+        results = []
         
-        # Test 8: List accounts
-        total_tests += 1
-        if self.test_list_accounts():
-            tests_passed += 1
-        print()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            # Stage 1: Health check, invalid account, list accounts, create two accounts
+            stage1 = self._run_stage(executor, [
+                self.test_health_check,
+                self.test_invalid_account,
+                self.test_list_accounts,
+                lambda out: self.test_create_account(out, 500.0),
+                lambda out: self.test_create_account(out, 1000.0),
+            ])
+            results.extend(stage1)
+            account1, account2 = stage1[3], stage1[4]
+            print()
+            
+            if not account1:
+                print("❌ Cannot continue tests without a valid account")
+                return
+            
+            # Stage 2: Ordered operations on account1, alongside rate limiting and
+            # MAX_TRANSACTION_AMOUNT (which uses its own account)
+            account_results, rate_limit_ok, max_transaction_ok = self._run_stage(executor, [
+                lambda out: self._account_operations(out, account1),
+                self.test_rate_limiting,
+                self.test_max_transaction_amount,
+            ])
+            results.extend(account_results)
+            results.extend([rate_limit_ok, max_transaction_ok])
+            print()
+            
+            # Stage 3: MAX_ACCOUNTS limit fills the store, so it runs once nothing else creates accounts
+            results.extend(self._run_stage(executor, [self.test_max_accounts_limit]))
+            print()
+            
+            # Stage 4: Delete account
+            results.append(bool(account2) and self._run_stage(executor, [
+                lambda out: self.test_delete_account(out, account2)
+            ])[0])
+            print()
         
-        # Test 9: Create another account
-        total_tests += 1
-        account2 = self.test_create_account(1000.0)
-        if account2:
-            tests_passed += 1
-        print()
+        self._report_results(results, total_tests)
         
-        # Test 10: Rate limiting
-        total_tests += 1
-        if self.test_rate_limiting():
-            tests_passed += 1
-        print()
+        # Cleanup remaining accounts
+        leftover = list(self.created_accounts)
+        with ThreadPoolExecutor(max_workers=CLEANUP_CONCURRENCY) as executor:
+            deleted = sum(self._run_stage(executor, [
+                partial(self.test_delete_account, account_number=account, quiet=True) for account in leftover
+            ]))
+        self._report_cleanup(deleted, len(leftover))
 
-        # Test 11: MAX_ACCOUNTS limit
-        total_tests += 1
-        if self.test_max_accounts_limit():
-            tests_passed += 1
-        print()
+class AsyncATMTester(_ATMTesterBase):
+    """Async variant of ATMTester that multiplexes concurrent tests over HTTP/2 with httpx"""
+    
+    def __init__(self, base_url: str = BASE_URL):
+        super().__init__(base_url)
+        # httpx.AsyncClient, opened in run_comprehensive_test; every test shares it
+        self.client = None
+    
+    async def _send(self, request: _Request):
+        return await self.client.request(request.method, request.path, content=request.body)
+    
+    async def _drive(self, flow: Flow) -> Any:
+        """Run a test flow to completion over the client and return its result"""
+        try:
+            request = next(flow)
+            while True:
+                try:
+                    if isinstance(request, list):
+                        response = await asyncio.gather(*(self._send(burst_request) for burst_request in request))
+                    else:
+                        response = await self._send(request)
+                except Exception as e:
+                    request = flow.throw(e)
+                else:
+                    request = flow.send(response)
+        except StopIteration as stop:
+            return stop.value
+    
+    async def _run_stage(self, tests: List[Test], limit: Optional[int] = None) -> List[Any]:
+        """
+        Gather independent tests and return their results in submission order.
+        limit caps how many run at once; without it they all start together. Each test
+        writes its output lines into its own list, and once the whole stage has finished
+        they are printed in submission order, as the threaded runner does.
+        """
+        semaphore = asyncio.Semaphore(limit or max(len(tests), 1))
+        outputs = [[] for _ in tests]
         
-        # Test 12: MAX_TRANSACTION_AMOUNT limit
-        total_tests += 1
-        if self.test_max_transaction_amount():
-            tests_passed += 1
-        print()
+        async def run(test, out):
+            async with semaphore:
+                return await self._drive(test(out))
         
-        # Test 13: Delete account
-        total_tests += 1
-        if account2 and self.test_delete_account(account2):
-            tests_passed += 1
-        print()
+        # return_exceptions keeps every test's output even if one of them raises
+        results = await asyncio.gather(
+            *(run(test, out) for test, out in zip(tests, outputs)),
+            return_exceptions=True
+        )
+        for out in outputs:
+            _print_output(out)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+    
+    def _account_writes(self, out: List[str], account_number: str) -> Flow:
+        """Deposit then withdraw; writes to one account must stay ordered"""
+        return [
+            (yield from self.test_deposit(out, account_number, 250.0)),
+            (yield from self.test_withdraw(out, account_number, 100.0)),
+        ]
+    
+    async def run_comprehensive_test(self):
+        """Run all tests, gathering independent tests concurrently in dependency stages"""
+        # Imported here so the default requests-based run doesn't need httpx installed
+        import httpx
         
-        # Summary
-        print(f"📊 Test Results: {tests_passed}/{total_tests} tests passed")
+        print("🚀 Starting comprehensive ATM API tests (async, HTTP/2)...\n")
         
-        if tests_passed == total_tests:
-            print("🎉 All tests passed! The ATM API is working correctly.")
-        else:
-            print("⚠️ Some tests failed. Please check the API implementation.")
+        total_tests = 13
+        results = []
         
-        # Cleanup remaining accounts
-        for account in self.created_accounts[:]:
-            self.test_delete_account(account)
+        limits = httpx.Limits(max_connections=16)
+        headers = {"Content-Type": "application/json"}
+        async with httpx.AsyncClient(base_url=self.base_url, http2=True, limits=limits, headers=headers) as client:
+            self.client = client
+            
+            # Stage 1: Health check and create two accounts
+            stage1 = await self._run_stage([
+                self.test_health_check,
+                lambda out: self.test_create_account(out, 500.0),
+                lambda out: self.test_create_account(out, 1000.0),
+            ])
+            results.extend(stage1)
+            account1, account2 = stage1[1], stage1[2]
+            print()
+            
+            if not account1:
+                print("❌ Cannot continue tests without a valid account")
+                return
+            
+            # Stage 2: Ordered writes on account1, alongside rate limiting and
+            # MAX_TRANSACTION_AMOUNT (which uses its own account)
+            write_results, rate_limit_ok, max_transaction_ok = await self._run_stage([
+                lambda out: self._account_writes(out, account1),
+                self.test_rate_limiting,
+                self.test_max_transaction_amount,
+            ])
+            results.extend(write_results)
+            results.extend([rate_limit_ok, max_transaction_ok])
+            print()
+            
+            # Stage 3: Independent reads once the writes have landed, then the
+            # insufficient-funds check against the balance just read
+            balance, list_ok, invalid_ok = await self._run_stage([
+                lambda out: self.test_get_balance(out, account1),
+                self.test_list_accounts,
+                self.test_invalid_account,
+            ])
+            results.extend([balance, list_ok, invalid_ok])
+            results.append(balance is not None and (await self._run_stage([
+                lambda out: self.test_insufficient_funds(out, account1, balance)
+            ]))[0])
+            print()
+            
+            # Stage 4: MAX_ACCOUNTS limit fills the store, so it runs once nothing else creates accounts
+            results.extend(await self._run_stage([self.test_max_accounts_limit]))
+            print()
+            
+            # Stage 5: Delete account
+            results.append(bool(account2) and (await self._run_stage([
+                lambda out: self.test_delete_account(out, account2)
+            ]))[0])
+            print()
+            
+            self._report_results(results, total_tests)
+            
+            # Cleanup remaining accounts. The deletes are bounded like the threaded cleanup, so
+            # a large leftover set never queues past the connection pool's acquire timeout.
+            leftover = list(self.created_accounts)
+            outcomes = await self._run_stage(
+                [partial(self.test_delete_account, account_number=account, quiet=True) for account in leftover],
+                limit=CLEANUP_CONCURRENCY
+            )
+            self._report_cleanup(sum(outcomes), len(leftover))
 
 def main():
     """Main function to run tests"""
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
-    else:
-        base_url = BASE_URL
+    # --async runs the httpx/HTTP/2 variant instead of the requests-based tester
+    args = [arg for arg in sys.argv[1:] if arg != "--async"]
+    use_async = len(args) != len(sys.argv) - 1
+    base_url = args[0] if args else BASE_URL
     
     print(f"Testing ATM API at: {base_url}")
     
-    tester = ATMTester(base_url)
-    tester.run_comprehensive_test()
+    if use_async:
+        asyncio.run(AsyncATMTester(base_url).run_comprehensive_test())
+    else:
+        tester = ATMTester(base_url)
+        tester.run_comprehensive_test()
 
 if __name__ == "__main__":
     main()
@@ -5,6 +5,7 @@ Tests the deployed ATM system to verify it's working correctly in production.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import sys
 import time
 
@@ -19,97 +20,110 @@ def test_deployment(base_url):
     total_tests = 6
     
     try:
-        # Test 1: Health Check
-        print("\n🔍 Testing health check...")
-        response = requests.get(f"{base_url}/health", timeout=30)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Health check passed: {data['status']}")
-            print(f"   Version: {data.get('version', 'N/A')}")
-            print(f"   Max accounts: {data.get('max_accounts', 'N/A')}")
-            tests_passed += 1
-        else:
-            print(f"❌ Health check failed: {response.status_code}")
-        
-        # Test 2: Create Account
-        print("\n🔍 Testing account creation...")
-        create_response = requests.post(
-            f"{base_url}/accounts", 
-            json={"initial_balance": 500.0},
-            timeout=30
-        )
-        if create_response.status_code == 201:
-            account_data = create_response.json()
-            account_number = account_data["account_number"]
-            print(f"✅ Account created: {account_number[:8]}...")
-            tests_passed += 1
-        else:
-            print(f"❌ Account creation failed: {create_response.status_code}")
-            account_number = None
-        
-        if account_number:
-            # Test 3: Get Balance
-            print("\n🔍 Testing balance retrieval...")
-            balance_response = requests.get(f"{base_url}/accounts/{account_number}/balance", timeout=30)
-            if balance_response.status_code == 200:
-                balance_data = balance_response.json()
-                print(f"✅ Balance retrieved: ${balance_data['balance']}")
-                tests_passed += 1
-            else:
-                print(f"❌ Balance retrieval failed: {balance_response.status_code}")
+        # One keep-alive session for every call so the TLS handshake is paid once
+        with requests.Session() as s:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
             
-            # Test 4: Deposit
-            print("\n🔍 Testing deposit...")
-            deposit_response = requests.post(
-                f"{base_url}/accounts/{account_number}/deposit",
-                json={"amount": 100.0},
-                timeout=30
-            )
-            if deposit_response.status_code == 200:
-                deposit_data = deposit_response.json()
-                print(f"✅ Deposit successful: New balance ${deposit_data['new_balance']}")
+            # Warm-up: wake a cold-started instance and open the pooled TLS connection
+            # before the tests, so they all reuse it; failures surface in Test 1
+            try:
+                s.get(f"{base_url}/health", timeout=90)
+            except requests.exceptions.RequestException:
+                pass
+            
+            # Test 1: Health Check
+            print("\n🔍 Testing health check...")
+            response = s.get(f"{base_url}/health", timeout=30)
+            if response.status_code == 200:
+                data = response.json()
+                print(f"✅ Health check passed: {data['status']}")
+                print(f"   Version: {data.get('version', 'N/A')}")
+                print(f"   Max accounts: {data.get('max_accounts', 'N/A')}")
                 tests_passed += 1
             else:
-                print(f"❌ Deposit failed: {deposit_response.status_code}")
+                print(f"❌ Health check failed: {response.status_code}")
             
-            # Test 5: Withdraw
-            print("\n🔍 Testing withdrawal...")
-            withdraw_response = requests.post(
-                f"{base_url}/accounts/{account_number}/withdraw",
-                json={"amount": 50.0},
+            # Test 2: Create Account
+            print("\n🔍 Testing account creation...")
+            create_response = s.post(
+                f"{base_url}/accounts", 
+                json={"initial_balance": 500.0},
                 timeout=30
             )
-            if withdraw_response.status_code == 200:
-                withdraw_data = withdraw_response.json()
-                print(f"✅ Withdrawal successful: New balance ${withdraw_data['new_balance']}")
+            if create_response.status_code == 201:
+                account_data = create_response.json()
+                account_number = account_data["account_number"]
+                print(f"✅ Account created: {account_number[:8]}...")
                 tests_passed += 1
             else:
-                print(f"❌ Withdrawal failed: {withdraw_response.status_code}")
+                print(f"❌ Account creation failed: {create_response.status_code}")
+                account_number = None
             
-            # Test 6: Cleanup
-            print("\n🔍 Testing account deletion...")
-            delete_response = requests.delete(f"{base_url}/accounts/{account_number}", timeout=30)
-            if delete_response.status_code == 204:
-                print("✅ Account deleted successfully")
-                tests_passed += 1
+            if account_number:
+                # Test 3: Get Balance
+                print("\n🔍 Testing balance retrieval...")
+                balance_response = s.get(f"{base_url}/accounts/{account_number}/balance", timeout=30)
+                if balance_response.status_code == 200:
+                    balance_data = balance_response.json()
+                    print(f"✅ Balance retrieved: ${balance_data['balance']}")
+                    tests_passed += 1
+                else:
+                    print(f"❌ Balance retrieval failed: {balance_response.status_code}")
+            
+                # Test 4: Deposit
+                print("\n🔍 Testing deposit...")
+                deposit_response = s.post(
+                    f"{base_url}/accounts/{account_number}/deposit",
+                    json={"amount": 100.0},
+                    timeout=30
+                )
+                if deposit_response.status_code == 200:
+                    deposit_data = deposit_response.json()
+                    print(f"✅ Deposit successful: New balance ${deposit_data['new_balance']}")
+                    tests_passed += 1
+                else:
+                    print(f"❌ Deposit failed: {deposit_response.status_code}")
+            
+                # Test 5: Withdraw
+                print("\n🔍 Testing withdrawal...")
+                withdraw_response = s.post(
+                    f"{base_url}/accounts/{account_number}/withdraw",
+                    json={"amount": 50.0},
+                    timeout=30
+                )
+                if withdraw_response.status_code == 200:
+                    withdraw_data = withdraw_response.json()
+                    print(f"✅ Withdrawal successful: New balance ${withdraw_data['new_balance']}")
+                    tests_passed += 1
+                else:
+                    print(f"❌ Withdrawal failed: {withdraw_response.status_code}")
+            
+                # Test 6: Cleanup
+                print("\n🔍 Testing account deletion...")
+                delete_response = s.delete(f"{base_url}/accounts/{account_number}", timeout=30)
+                if delete_response.status_code == 204:
+                    print("✅ Account deleted successfully")
+                    tests_passed += 1
+                else:
+                    print(f"⚠️ Account deletion failed: {delete_response.status_code} (may be rate limited)")
+                    # Still count as passed since this might be rate limiting
+                    tests_passed += 1
+            
+            # Summary
+            print(f"\n📊 Deployment Test Results: {tests_passed}/{total_tests} tests passed")
+            
+            if tests_passed == total_tests:
+                print("🎉 Deployment is working perfectly!")
+                print("🌐 Your ATM system is live and ready for use!")
+                return True
+            elif tests_passed >= total_tests - 1:
+                print("✅ Deployment is working well (minor issues may be due to rate limiting)")
+                return True
             else:
-                print(f"⚠️ Account deletion failed: {delete_response.status_code} (may be rate limited)")
-                # Still count as passed since this might be rate limiting
-                tests_passed += 1
-        
-        # Summary
-        print(f"\n📊 Deployment Test Results: {tests_passed}/{total_tests} tests passed")
-        
-        if tests_passed == total_tests:
-            print("🎉 Deployment is working perfectly!")
-            print("🌐 Your ATM system is live and ready for use!")
-            return True
-        elif tests_passed >= total_tests - 1:
-            print("✅ Deployment is working well (minor issues may be due to rate limiting)")
-            return True
-        else:
-            print("⚠️ Some tests failed. Please check your deployment.")
-            return False
+                print("⚠️ Some tests failed. Please check your deployment.")
+                return False
             
     except requests.exceptions.Timeout:
         print("⏰ Request timed out. This might be a cold start - try again in a moment.")